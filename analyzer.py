@@ -3,32 +3,65 @@ Dataset analyzer - traverses directories and analyzes annotation files.
 """
 
 import os
+import math
+import random
+import posixpath
+from statistics import NormalDist
 from pathlib import Path
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from collections import defaultdict, Counter
 
-from parsers.xml_parser import parse_xml, is_xml_file
-from parsers.json_parser import parse_json, is_json_file
-from parsers.txt_parser import parse_txt, is_txt_file, find_class_names_file, load_class_names
+from parsers.xml_parser import parse_xml, parse_xml_bytes, is_xml_file
+from parsers.json_parser import parse_json, parse_json_bytes, is_json_file
+from parsers.txt_parser import parse_txt, parse_txt_bytes, is_txt_file, find_class_names_file, load_class_names
+from archives import is_archive_file, iter_archive_members, virtual_path
+from prefetch import prefetch_files, DEFAULT_PREFETCH_BYTES
+
+
+# Directories that are never descended into
+SKIP_DIRS = ['__pycache__', 'node_modules', '__MACOSX']
+
+# YOLO class name files, not annotations
+CLASS_NAME_FILES = ['classes.txt', 'obj.names', 'class.names', 'labels.txt']
+
+# Default number of files parsed per directory in estimate mode
+DEFAULT_SAMPLE_SIZE = 20
+
+
+def should_skip_dir(name: str) -> bool:
+    """Check if a directory should be skipped during traversal."""
+    return name.startswith('.') or name in SKIP_DIRS
 
 
 class DatasetAnalyzer:
     """Analyzes dataset directories and extracts annotation statistics."""
     
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, scan_archives: bool = False,
+                 io_workers: int = 0, prefetch_bytes: int = DEFAULT_PREFETCH_BYTES):
         """
         Initialize analyzer.
         
         Args:
             root_path: Root directory to analyze
+            scan_archives: Also read annotation files inside zip/tar archives
+            io_workers: Threads prefetching file contents (0 reads inline)
+            prefetch_bytes: Memory budget for prefetched file contents
         """
         self.root_path = Path(root_path).resolve()
+        self.scan_archives = scan_archives
+        self.io_workers = io_workers
+        self.prefetch_bytes = prefetch_bytes
+        # locations/types count contributing files so they can be decremented
         self.class_stats = defaultdict(lambda: {
             'count': 0,
             'files': set(),
-            'locations': set(),
-            'types': set()
+            'locations': Counter(),
+            'types': Counter()
         })
+        # Per-file contributions: file path -> (location, file type, {class: count})
+        self.file_stats = {}
+        # Archive path -> virtual paths of its recorded members
+        self.archive_files = defaultdict(set)
         self.yolo_class_names = None
         
     def analyze(self) -> Dict[str, Any]:
@@ -48,22 +81,91 @@ class DatasetAnalyzer:
         return results
     
     def _traverse_directory(self, directory: Path):
-        """Recursively traverse directory and process annotation files."""
+        """Traverse directory and process annotation files."""
+        files = self._iter_annotation_files(directory)
+        for file_path, file_type, annotations in self._parse_many(files):
+            if annotations:
+                # Use absolute location
+                location = str(file_path.parent.resolve())
+                self._add_file_stats(str(file_path), location, file_type, annotations)
+    
+    def _iter_annotation_files(self, directory: Path) -> Iterator[Path]:
+        """Recursively yield annotation files. Archives are processed as they are found."""
         try:
             for item in directory.iterdir():
                 if item.is_file():
-                    self._process_file(item)
+                    if self.scan_archives and is_archive_file(str(item)):
+                        self._process_archive(item)
+                    elif self._is_annotation_name(item.name):
+                        yield item
                 elif item.is_dir():
                     # Skip hidden directories and common non-data directories
-                    if not item.name.startswith('.') and item.name not in ['__pycache__', 'node_modules']:
-                        self._traverse_directory(item)
+                    if not should_skip_dir(item.name):
+                        yield from self._iter_annotation_files(item)
         except PermissionError:
             print(f"Permission denied: {directory}")
         except Exception as e:
             print(f"Error traversing {directory}: {e}")
     
+    def _parse_many(self, paths: Iterable[Path]) -> Iterator[Tuple[Path, str, Dict[str, List[str]]]]:
+        """
+        Parse annotation files, prefetching contents on a thread pool if enabled.
+        
+        With prefetching, results arrive in completion order.
+        """
+        if self.io_workers <= 0:
+            for file_path in paths:
+                file_type, annotations = self._parse_file(file_path)
+                yield file_path, file_type, annotations
+            return
+        
+        for file_path, data in prefetch_files(paths, self.io_workers, self.prefetch_bytes):
+            if data is None:
+                continue
+            file_type, annotations = self._parse_bytes(file_path.name, data, str(file_path))
+            yield file_path, file_type, annotations
+    
     def _process_file(self, file_path: Path):
         """Process a single annotation file."""
+        if self.scan_archives and is_archive_file(str(file_path)):
+            self._process_archive(file_path)
+            return
+        
+        file_type, annotations = self._parse_file(file_path)
+        
+        # Update statistics
+        if annotations:
+            # Use absolute location
+            location = str(file_path.parent.resolve())
+            self._add_file_stats(str(file_path), location, file_type, annotations)
+    
+    def _process_archive(self, archive_path: Path):
+        """Process annotation files inside an archive, reported under virtual paths."""
+        archive = str(archive_path)
+        location_root = str(archive_path.resolve())
+        try:
+            for member_name, data in iter_archive_members(archive, self._is_annotation_member):
+                file_key = virtual_path(archive, member_name)
+                file_type, annotations = self._parse_bytes(member_name, data, file_key)
+                if annotations:
+                    location = virtual_path(location_root, posixpath.dirname(member_name))
+                    self._add_file_stats(file_key, location, file_type, annotations)
+                    self.archive_files[archive].add(file_key)
+        except Exception as e:
+            print(f"Error reading archive {archive_path}: {e}")
+    
+    def _parse_bytes(self, name: str, data: bytes, source: str) -> Tuple[str, Dict[str, List[str]]]:
+        """Parse in-memory annotation content, dispatching on the file name."""
+        if is_xml_file(name):
+            return "XML", parse_xml_bytes(data, source)
+        if is_json_file(name):
+            return "JSON", parse_json_bytes(data, source)
+        if is_txt_file(name) and posixpath.basename(name) not in CLASS_NAME_FILES:
+            return "TXT", parse_txt_bytes(data, None, source)
+        return "Unknown", {}
+    
+    def _parse_file(self, file_path: Path) -> Tuple[str, Dict[str, List[str]]]:
+        """Parse an annotation file, returning its type and annotations."""
         annotations = {}
         file_type = "Unknown"
         
@@ -76,22 +178,245 @@ class DatasetAnalyzer:
             file_type = "JSON"
         elif is_txt_file(str(file_path)):
             # Skip class names files
-            if file_path.name in ['classes.txt', 'obj.names', 'class.names', 'labels.txt']:
-                return
+            if file_path.name in CLASS_NAME_FILES:
+                return file_type, {}
             # Pass None for class_names to use raw indices
             annotations = parse_txt(str(file_path), None)
             file_type = "TXT"
         
-        # Update statistics
-        if annotations:
-            # Use absolute location
-            location = str(file_path.parent.resolve())
+        return file_type, annotations
+    
+    def _add_file_stats(self, file_key: str, location: str, file_type: str,
+                        annotations: Dict[str, List[str]]):
+        """Add one file's annotations to the class statistics."""
+        counts = {class_name: len(bbox_list) for class_name, bbox_list in annotations.items()}
+        self.file_stats[file_key] = (location, file_type, counts)
+        
+        for class_name, count in counts.items():
+            stats = self.class_stats[class_name]
+            stats['count'] += count
+            stats['files'].add(file_key)
+            stats['locations'][location] += 1
+            stats['types'][file_type] += 1
+    
+    def _remove_file_stats(self, file_key: str):
+        """Subtract one file's (or archive's) previously recorded annotations."""
+        for member_key in self.archive_files.pop(file_key, ()):
+            self._remove_file_stats(member_key)
+        
+        entry = self.file_stats.pop(file_key, None)
+        if entry is None:
+            return
+        
+        location, file_type, counts = entry
+        for class_name, count in counts.items():
+            stats = self.class_stats[class_name]
+            stats['count'] -= count
+            stats['files'].discard(file_key)
+            stats['locations'][location] -= 1
+            if stats['locations'][location] <= 0:
+                del stats['locations'][location]
+            stats['types'][file_type] -= 1
+            if stats['types'][file_type] <= 0:
+                del stats['types'][file_type]
+            if not stats['files']:
+                del self.class_stats[class_name]
+    
+    def update_file(self, file_path: str):
+        """
+        Re-apply a created or modified file to the statistics.
+        
+        Only the given file is parsed; its previous contribution (if any)
+        is replaced.
+        
+        Args:
+            file_path: Path to the changed file
+        """
+        path = Path(file_path)
+        self._remove_file_stats(str(path))
+        if path.is_file():
+            self._process_file(path)
+    
+    def remove_file(self, file_path: str):
+        """
+        Remove a deleted file from the statistics.
+        
+        Args:
+            file_path: Path to the deleted file
+        """
+        self._remove_file_stats(str(Path(file_path)))
+    
+    def remove_directory(self, dir_path: str):
+        """
+        Remove every file below a deleted or moved-away directory.
+        
+        Args:
+            dir_path: Path to the directory
+        """
+        prefix = str(Path(dir_path)) + os.sep
+        keys = list(self.archive_files) + list(self.file_stats)
+        for file_key in [k for k in keys if k.startswith(prefix)]:
+            self._remove_file_stats(file_key)
+    
+    def get_results(self) -> Dict[str, Any]:
+        """Get formatted results for the current statistics."""
+        return self._format_results()
+    
+    def estimate(self, sample_size: int = DEFAULT_SAMPLE_SIZE, confidence: float = 0.95,
+                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Quickly estimate the dataset statistics from a random sample.
+        
+        The directory tree is walked in full, but only up to `sample_size`
+        annotation files per directory are parsed. Per-class totals are
+        extrapolated per directory (stratified sampling) and summed, with
+        normal-approximation confidence intervals. Archives are not sampled;
+        with scan_archives enabled, the number of archives left out is
+        reported as `archives_skipped`.
+        
+        Args:
+            sample_size: Maximum annotation files parsed per directory
+            confidence: Confidence level of the reported intervals
+            seed: Random seed for reproducible samples
+            
+        Returns:
+            Dictionary containing estimated analysis results
+            
+        Raises:
+            ValueError: If sample_size is less than 1
+        """
+        if sample_size < 1:
+            raise ValueError("sample_size must be at least 1")
+        
+        rng = random.Random(seed)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        
+        # One pipeline over all samples so reads overlap across directories;
+        # results are accumulated into their directory as they arrive
+        strata = {}
+        skipped_archives = []
+        samples = self._iter_samples(sample_size, rng, strata, skipped_archives)
+        for file_path, file_type, annotations in self._parse_many(samples):
+            if not annotations:
+                continue
+            
+            # Sampled files are recorded as in an exact scan
+            self._add_file_stats(str(file_path), str(file_path.parent.resolve()),
+                                 file_type, annotations)
             
+            stratum = strata[str(file_path.parent)]
+            stratum['annotated'] += 1
+            file_total = sum(len(bbox_list) for bbox_list in annotations.values())
+            stratum['file_totals'][0] += file_total
+            stratum['file_totals'][1] += file_total ** 2
             for class_name, bbox_list in annotations.items():
-                self.class_stats[class_name]['count'] += len(bbox_list)
-                self.class_stats[class_name]['files'].add(str(file_path))
-                self.class_stats[class_name]['locations'].add(location)
-                self.class_stats[class_name]['types'].add(file_type)
+                sums = stratum['sums'][class_name]
+                sums[0] += len(bbox_list)
+                sums[1] += len(bbox_list) ** 2
+                sums[2] += 1
+        
+        # Per class: [annotation total, annotation variance, file total, file variance]
+        estimates = defaultdict(lambda: [0.0, 0.0, 0.0, 0.0])
+        # [total, variance] of annotated files and of all annotations; the
+        # latter uses per-file totals since class counts within a file correlate
+        annotated_files = [0.0, 0.0]
+        all_annotations = [0.0, 0.0]
+        
+        for stratum in strata.values():
+            n = stratum['n']
+            population = stratum['population']
+            annotated = stratum['annotated']
+            total, variance = _extrapolate(annotated, annotated, n, population)
+            annotated_files[0] += total
+            annotated_files[1] += variance
+            total, variance = _extrapolate(*stratum['file_totals'], n, population)
+            all_annotations[0] += total
+            all_annotations[1] += variance
+            for class_name, (count, squares, files) in stratum['sums'].items():
+                entry = estimates[class_name]
+                total, variance = _extrapolate(count, squares, n, population)
+                entry[0] += total
+                entry[1] += variance
+                total, variance = _extrapolate(files, files, n, population)
+                entry[2] += total
+                entry[3] += variance
+        
+        results = self._format_results()
+        
+        # Replace sample counts with extrapolated counts, keeping the
+        # observed sample as the lower bound of each interval
+        for class_data in results['classes']:
+            count, count_var, files, files_var = estimates[class_data['class_name']]
+            class_data['annotations_ci'] = _interval(count, count_var, z, class_data['annotations'])
+            class_data['files_ci'] = _interval(files, files_var, z, class_data['files'])
+            class_data['annotations'] = round(count)
+            class_data['files'] = round(files)
+        
+        results['total_annotations_ci'] = _interval(all_annotations[0], all_annotations[1], z,
+                                                    results['total_annotations'])
+        results['total_files_ci'] = _interval(annotated_files[0], annotated_files[1], z,
+                                              results['total_files'])
+        results['total_annotations'] = round(all_annotations[0])
+        results['total_files'] = round(annotated_files[0])
+        results.update({
+            'estimated': True,
+            'confidence': confidence,
+            'sample_size': sample_size,
+            'sampled_files': sum(stratum['n'] for stratum in strata.values()),
+            'candidate_files': sum(stratum['population'] for stratum in strata.values()),
+            'archives_skipped': len(skipped_archives)
+        })
+        return results
+    
+    def _iter_samples(self, sample_size: int, rng: random.Random,
+                      strata: Dict[str, Dict[str, Any]],
+                      skipped_archives: List[str]) -> Iterator[Path]:
+        """
+        Walk the tree and yield a random sample of annotation files per directory.
+        
+        Symlinked directories are followed, as in the exact scan.
+        
+        Each sampled directory is registered in `strata` (keyed by directory
+        path) before its files are yielded. With scan_archives enabled,
+        archives found on the way are collected in `skipped_archives`.
+        """
+        for dirpath, dirnames, filenames in os.walk(self.root_path, followlinks=True):
+            dirnames[:] = [d for d in dirnames if not should_skip_dir(d)]
+            if self.scan_archives:
+                skipped_archives.extend(os.path.join(dirpath, f) for f in filenames if is_archive_file(f))
+            
+            candidates = [f for f in filenames if self._is_annotation_name(f)]
+            if not candidates:
+                continue
+            
+            directory = Path(dirpath)
+            sample = rng.sample(candidates, min(sample_size, len(candidates)))
+            strata[str(directory)] = {
+                'n': len(sample),
+                'population': len(candidates),
+                'annotated': 0,
+                # Sum and sum of squares of per-file annotation totals
+                'file_totals': [0, 0],
+                # Per class: [annotation sum, annotation sum of squares, files with class]
+                'sums': defaultdict(lambda: [0, 0, 0])
+            }
+            for filename in sample:
+                yield directory / filename
+    
+    @staticmethod
+    def _is_annotation_member(member_name: str) -> bool:
+        """Check if an archive member is an annotation file outside skipped directories."""
+        *directories, filename = member_name.split('/')
+        if any(should_skip_dir(name) for name in directories):
+            return False
+        return DatasetAnalyzer._is_annotation_name(filename)
+    
+    @staticmethod
+    def _is_annotation_name(filename: str) -> bool:
+        """Check if a file name looks like a parseable annotation file."""
+        if posixpath.basename(filename) in CLASS_NAME_FILES:
+            return False
+        return is_xml_file(filename) or is_json_file(filename) or is_txt_file(filename)
     
     def _get_relative_location(self, directory: Path) -> str:
         """Get relative path from root."""
@@ -116,21 +441,66 @@ class DatasetAnalyzer:
         return {
             'total_classes': len(self.class_stats),
             'total_annotations': sum(s['count'] for s in self.class_stats.values()),
-            'total_files': len(set(f for s in self.class_stats.values() for f in s['files'])),
+            'total_files': len(self.file_stats),
             'classes': results,
             'root_path': str(self.root_path)
         }
 
 
-def analyze_dataset(root_path: str) -> Dict[str, Any]:
+def _extrapolate(total: float, squares: float, n: int, population: int) -> Tuple[float, float]:
+    """
+    Extrapolate a sample sum to a directory population.
+    
+    Args:
+        total: Sum of the per-file values in the sample
+        squares: Sum of the squared per-file values in the sample
+        n: Number of sampled files
+        population: Number of files in the directory
+        
+    Returns:
+        Tuple of (estimated population total, variance of the estimate)
+    """
+    mean = total / n
+    if n >= population:
+        return float(total), 0.0
+    if n > 1:
+        sample_var = max(squares - n * mean * mean, 0.0) / (n - 1)
+    else:
+        # A single observation gives no spread; assume a Poisson-like one
+        sample_var = mean
+    finite_correction = 1 - n / population
+    return population * mean, population ** 2 * finite_correction * sample_var / n
+
+
+def _interval(estimate: float, variance: float, z: float, observed: int) -> List[int]:
+    """Build a [low, high] confidence interval, never below the observed count."""
+    margin = z * math.sqrt(variance)
+    return [max(observed, math.floor(estimate - margin)), math.ceil(estimate + margin)]
+
+
+def analyze_dataset(root_path: str, estimate: bool = False,
+                    sample_size: int = DEFAULT_SAMPLE_SIZE,
+                    seed: Optional[int] = None,
+                    scan_archives: bool = False,
+                    io_workers: int = 0,
+                    prefetch_bytes: int = DEFAULT_PREFETCH_BYTES) -> Dict[str, Any]:
     """
     Analyze a dataset directory.
     
     Args:
         root_path: Root directory path
+        estimate: Return a fast sampled estimate instead of exact counts
+        sample_size: Files parsed per directory in estimate mode
+        seed: Random seed for estimate mode
+        scan_archives: Also read annotation files inside zip/tar archives
+        io_workers: Threads prefetching file contents (0 reads inline)
+        prefetch_bytes: Memory budget for prefetched file contents
         
     Returns:
         Analysis results dictionary
     """
-    analyzer = DatasetAnalyzer(root_path)
+    analyzer = DatasetAnalyzer(root_path, scan_archives=scan_archives,
+                               io_workers=io_workers, prefetch_bytes=prefetch_bytes)
+    if estimate:
+        return analyzer.estimate(sample_size=sample_size, seed=seed)
     return analyzer.analyze()
@@ -3,22 +3,51 @@ Dataset Finder - Flask Application
 A lightweight dataset management tool for deep learning engineers.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+import time
+
+# Measured from the earliest point we control to track cold start latency
+_PROCESS_START = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, send_file, Response
 import os
+import gzip
+import json
+import threading
+import uuid
 from pathlib import Path
 from datetime import datetime
-import argparse
 
-from analyzer import analyze_dataset
-from exporter import export_to_excel
+import result_codec
+
+# Heavy modules (analyzer/parsers, watcher, openpyxl via exporter) are
+# imported inside the endpoints that need them to keep cold start fast.
 
 app = Flask(__name__, static_folder='static', template_folder='static')
 
-import platform
+# File prefetch threads for scans (0 reads inline); set with --io-workers
+app.config.setdefault('IO_WORKERS', 0)
+app.config.setdefault('PREFETCH_BYTES', 64 * 1024 * 1024)
 
-# Create exports directory
+# Exports directory, created on first export
 EXPORTS_DIR = Path('exports')
-EXPORTS_DIR.mkdir(exist_ok=True)
+
+# Active dataset watchers, keyed by (resolved root path, scan_archives).
+# Entries are {'watcher': DatasetWatcher, 'subscribers': int}; a watcher is
+# stopped when its last stream closes.
+WATCHERS = {}
+WATCHERS_LOCK = threading.Lock()
+
+# Seconds between keep-alive comments on idle watch streams
+WATCH_KEEPALIVE = 15
+
+# Background exact scans started after an estimate, keyed by job id
+ANALYSIS_JOBS = {}
+ANALYSIS_JOBS_LOCK = threading.Lock()
+MAX_ANALYSIS_JOBS = 20
+
+# Exact scans allowed to run at once; further jobs wait queued
+MAX_RUNNING_JOBS = 2
+RUNNING_JOBS = threading.BoundedSemaphore(MAX_RUNNING_JOBS)
 
 
 @app.route('/')
@@ -81,7 +110,7 @@ def list_dirs():
             'parent_path': str(parent) if parent != current_path else None,
             'directories': directories,
             'sep': os.sep,
-            'is_windows': platform.system() == 'Windows'
+            'is_windows': os.name == 'nt'
         })
 
     except Exception as e:
@@ -98,9 +127,17 @@ def analyze():
     
     Expected JSON payload:
     {
-        "path": "/path/to/dataset"
+        "path": "/path/to/dataset",
+        "mode": "exact" | "estimate",  # optional, default "exact"
+        "sample_size": 20,             # optional, files per directory
+        "scan_archives": false         # optional, read zip/tar archives
     }
     
+    In estimate mode the results are flagged with "estimated": true and an
+    exact scan is started in the background; poll it via the returned
+    "job_id" at /api/analyze/jobs/<job_id>. "job_id" is null when too
+    many background scans are pending.
+    
     Returns:
         JSON with analysis results
     """
@@ -117,10 +154,32 @@ def analyze():
         if not os.path.isdir(dataset_path):
             return jsonify({'error': 'Path is not a directory'}), 400
         
+        from analyzer import analyze_dataset, DEFAULT_SAMPLE_SIZE
+        
+        scan_archives = bool(data.get('scan_archives'))
+        
+        if data.get('mode') == 'estimate':
+            try:
+                raw_sample_size = data.get('sample_size')
+                sample_size = DEFAULT_SAMPLE_SIZE if raw_sample_size is None else int(raw_sample_size)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'sample_size must be an integer'}), 400
+            if sample_size < 1:
+                return jsonify({'error': 'sample_size must be positive'}), 400
+            
+            results = analyze_dataset(dataset_path, estimate=True, sample_size=sample_size,
+                                      scan_archives=scan_archives, **io_options())
+            
+            return results_response({
+                'success': True,
+                'data': results,
+                'job_id': start_exact_job(dataset_path, scan_archives)
+            })
+        
         # Analyze dataset
-        results = analyze_dataset(dataset_path)
+        results = analyze_dataset(dataset_path, scan_archives=scan_archives, **io_options())
         
-        return jsonify({
+        return results_response({
             'success': True,
             'data': results
         })
@@ -132,6 +191,223 @@ def analyze():
         }), 500
 
 
+def io_options() -> dict:
+    """File prefetch settings passed to analyze_dataset."""
+    return {
+        'io_workers': app.config['IO_WORKERS'],
+        'prefetch_bytes': app.config['PREFETCH_BYTES']
+    }
+
+
+def wants_compact() -> bool:
+    """Whether the client listed the compact media type in Accept."""
+    # Only an explicit Accept entry opts in; */* keeps plain JSON
+    return any(mimetype == result_codec.MEDIA_TYPE and quality > 0
+               for mimetype, quality in request.accept_mimetypes)
+
+
+def compact_response(body: bytes):
+    """Build a compact-format response, gzip-compressed when the client accepts it."""
+    response = Response(body, mimetype=result_codec.MEDIA_TYPE)
+    if request.accept_encodings['gzip'] > 0:
+        response.set_data(gzip.compress(body))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+
+def results_response(payload: dict):
+    """
+    Build a JSON response carrying analysis results in payload['data'].
+    
+    Clients that send the compact media type in Accept get the results in
+    the compact form (see result_codec), gzip-compressed when they accept it.
+    """
+    if not payload.get('data') or not wants_compact():
+        response = jsonify(payload)
+        # The body depends on these headers in the compact branch
+        response.headers['Vary'] = 'Accept, Accept-Encoding'
+        return response
+    
+    payload = dict(payload, data=result_codec.encode_results(payload['data']))
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return compact_response(body)
+
+
+def start_exact_job(dataset_path: str, scan_archives: bool = False):
+    """
+    Start an exact scan in a background thread and return its job id.
+    
+    An unfinished job for the same dataset is reused. At most
+    MAX_RUNNING_JOBS scans run at once; None is returned when
+    MAX_ANALYSIS_JOBS jobs are already queued or running.
+    """
+    from analyzer import analyze_dataset
+    
+    key = (str(Path(dataset_path).resolve()), scan_archives)
+    
+    with ANALYSIS_JOBS_LOCK:
+        for job_id, job in ANALYSIS_JOBS.items():
+            if job['key'] == key and job['status'] in ('queued', 'running'):
+                return job_id
+        
+        # Drop the oldest finished jobs to make room
+        finished = [k for k, j in ANALYSIS_JOBS.items() if j['status'] in ('done', 'error')]
+        for old_id in finished[:max(0, len(ANALYSIS_JOBS) - MAX_ANALYSIS_JOBS + 1)]:
+            del ANALYSIS_JOBS[old_id]
+        if len(ANALYSIS_JOBS) >= MAX_ANALYSIS_JOBS:
+            return None
+        
+        job_id = uuid.uuid4().hex
+        job = {'status': 'queued', 'key': key, 'data': None, 'error': None}
+        ANALYSIS_JOBS[job_id] = job
+    
+    def run():
+        with RUNNING_JOBS:
+            job['status'] = 'running'
+            try:
+                # Stored compressed; large results repeat long path prefixes
+                results = analyze_dataset(dataset_path, scan_archives=scan_archives, **io_options())
+                job['data'] = result_codec.dumps(results)
+                job['status'] = 'done'
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'error'
+    
+    threading.Thread(target=run, daemon=True).start()
+    return job_id
+
+
+@app.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def analyze_job(job_id):
+    """
+    Get the status of a background exact scan.
+    
+    Returns:
+        JSON with status ("queued", "running", "done" or "error") and, once
+        done, the exact analysis results
+    """
+    # Finished jobs stay until evicted, since several clients may share one
+    with ANALYSIS_JOBS_LOCK:
+        job = ANALYSIS_JOBS.get(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    if job['status'] == 'error':
+        return jsonify({
+            'success': False,
+            'status': 'error',
+            'error': job['error']
+        }), 500
+    
+    if job['data'] and wants_compact():
+        # Splice the stored compact JSON in as-is instead of decoding it
+        compact = gzip.decompress(job['data'])
+        return compact_response(b'{"success":true,"status":"done","data":' + compact + b'}')
+    
+    return results_response({
+        'success': True,
+        'status': job['status'],
+        'data': result_codec.loads(job['data']) if job['data'] else None
+    })
+
+
+@app.route('/api/watch', methods=['GET'])
+def watch():
+    """
+    Stream live analysis results for a dataset directory (Server-Sent Events).
+    
+    Query parameters:
+        path: /path/to/dataset
+        archives: 1 to also read zip/tar archives (optional)
+    
+    The first event carries the initial scan; each following event carries
+    results updated incrementally from filesystem changes. Results are sent
+    in the compact form (see result_codec).
+    """
+    dataset_path = request.args.get('path')
+    
+    if not dataset_path:
+        return jsonify({'error': 'No path provided'}), 400
+    
+    if not os.path.isdir(dataset_path):
+        return jsonify({'error': 'Path is not a directory'}), 400
+    
+    scan_archives = request.args.get('archives') == '1'
+    key = (str(Path(dataset_path).resolve()), scan_archives)
+    
+    from watcher import DatasetWatcher
+    
+    with WATCHERS_LOCK:
+        entry = WATCHERS.get(key)
+        if entry is None or entry['watcher'].stopped:
+            watcher = DatasetWatcher(key[0], scan_archives=scan_archives, **io_options())
+            entry = {'watcher': watcher, 'subscribers': 0}
+            WATCHERS[key] = entry
+        entry['subscribers'] += 1
+    watcher = entry['watcher']
+    release = release_watcher_once(key, entry)
+    
+    try:
+        # The initial scan runs outside WATCHERS_LOCK; only subscribers of
+        # the same tree wait for it
+        watcher.start()
+    except Exception as e:
+        release()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    def generate():
+        try:
+            version = 0
+            while watcher.running:
+                new_version, results = watcher.wait_for_update(version, timeout=WATCH_KEEPALIVE)
+                if new_version == version:
+                    yield ': keep-alive\n\n'
+                    continue
+                version = new_version
+                compact = result_codec.encode_results(results)
+                yield f"id: {version}\ndata: {json.dumps(compact)}\n\n"
+        finally:
+            release()
+    
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Also covers streams closed before the generator ever ran
+    response.call_on_close(release)
+    return response
+
+
+def release_watcher_once(key: tuple, entry: dict):
+    """
+    Build a callback that drops one subscriber from a watcher entry.
+    
+    The callback only counts once however often it is called. The watcher is
+    stopped when its last subscriber leaves.
+    """
+    released = threading.Event()
+    
+    def release():
+        if released.is_set():
+            return
+        released.set()
+        with WATCHERS_LOCK:
+            entry['subscribers'] -= 1
+            last = entry['subscribers'] <= 0
+            if last and WATCHERS.get(key) is entry:
+                del WATCHERS[key]
+        if last:
+            entry['watcher'].stop()
+    
+    return release
+
+
 @app.route('/api/export', methods=['POST'])
 def export():
     """
@@ -161,8 +437,11 @@ def export():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"dataset_analysis_{timestamp}.xlsx"
         
+        EXPORTS_DIR.mkdir(exist_ok=True)
         output_path = EXPORTS_DIR / filename
         
+        from exporter import export_to_excel
+        
         # Export to Excel
         export_to_excel(results, str(output_path))
         
@@ -186,34 +465,63 @@ def health():
     """Health check endpoint."""
     return jsonify({
         'status': 'healthy',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'startup_ms': round(STARTUP_SECONDS * 1000, 1)
     })
 
 
 def get_local_ip():
-    """Get local IP address for LAN access."""
+    """
+    Get local IP address for LAN access.
+    
+    Only asks the kernel which local address would route to a private
+    address; no packets are sent and no DNS lookup is made, so this
+    returns immediately on air-gapped machines.
+    """
     import socket
     try:
-        # Create a socket to get the local IP
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-        return local_ip
+        try:
+            s.setblocking(False)
+            s.connect(("10.255.255.255", 1))
+            return s.getsockname()[0]
+        finally:
+            s.close()
     except Exception:
         return "localhost"
 
 
+# Time to import this module (what a WSGI server pays before serving)
+STARTUP_SECONDS = time.perf_counter() - _PROCESS_START
+
+
 if __name__ == '__main__':
+    import argparse
+    
     parser = argparse.ArgumentParser(description='Dataset Finder - Dataset Management Tool')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to (default: 0.0.0.0 for LAN access)')
     parser.add_argument('--port', type=int, default=3000, help='Port to bind to (default: 5000)')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--io-workers', type=int, default=0,
+                        help='Threads prefetching annotation files during scans, e.g. 16 on NFS/SMB (default: 0, read inline)')
+    parser.add_argument('--prefetch-mb', type=int, default=64,
+                        help='Memory budget in MB for prefetched file contents (default: 64)')
+    parser.add_argument('--measure-startup', action='store_true',
+                        help='Print cold start time and exit without serving')
     
     args = parser.parse_args()
+    app.config['IO_WORKERS'] = max(0, args.io_workers)
+    app.config['PREFETCH_BYTES'] = max(1, args.prefetch_mb) * 1024 * 1024
+    
+    # LAN address is only meaningful when binding to all interfaces
+    local_ip = get_local_ip() if args.host == '0.0.0.0' else args.host
+    STARTUP_SECONDS = time.perf_counter() - _PROCESS_START
+    
+    if args.measure_startup:
+        print(f"startup_ms={STARTUP_SECONDS * 1000:.1f}")
+        raise SystemExit(0)
     
     # Display startup information
-    local_ip = get_local_ip()
     print("\n" + "="*60)
     print("  Dataset Finder - Dataset Management Tool")
     print("="*60)
@@ -221,10 +529,12 @@ if __name__ == '__main__':
     print(f"  🌐 LAN access:      http://{local_ip}:{args.port}")
     print(f"\n  📁 Supported formats: YOLO, COCO, Pascal VOC")
     print(f"  🔒 Privacy: All processing is local")
+    print(f"  ⏱  Startup time:    {STARTUP_SECONDS * 1000:.0f} ms")
     print("\n" + "="*60 + "\n")
     
     app.run(
         host=args.host,
         port=args.port,
-        debug=args.debug
+        debug=args.debug,
+        threaded=True
     )
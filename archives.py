@@ -0,0 +1,79 @@
+"""
+Archive reader - streams members of zip/tar archives without extracting
+them to disk.
+"""
+
+import posixpath
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+
+# Archive suffixes recognized when scanning (compound suffixes first)
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip')
+
+# Separator between an archive path and a member path in virtual paths,
+# e.g. /data/set.zip!/labels/train/img1.txt
+ARCHIVE_SEPARATOR = '!/'
+
+
+def is_archive_file(file_path: str) -> bool:
+    """Check if file is a supported zip/tar archive."""
+    return Path(file_path).name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def normalize_member_name(member_name: str) -> str:
+    """
+    Normalize an archive member name to a plain relative path.
+
+    Leading '/' and './' (as in `tar -C dir .`) are removed, so
+    './labels/a.txt' becomes 'labels/a.txt'. Backslash separators written
+    by some Windows zip tools are converted to '/'.
+    """
+    name = posixpath.normpath(member_name.replace('\\', '/').lstrip('/'))
+    return '' if name == '.' else name
+
+
+def virtual_path(archive_path: str, member_name: str) -> str:
+    """Build the virtual path reported for an archive member."""
+    member_name = normalize_member_name(member_name)
+    return f"{archive_path}{ARCHIVE_SEPARATOR}{member_name}" if member_name else archive_path
+
+
+def iter_archive_members(archive_path: str,
+                         name_filter: Callable[[str], bool]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read matching regular-file members of a zip or tar archive into memory.
+
+    Members are read one at a time, so memory use is bounded by the largest
+    selected member. Tar archives (including compressed ones) are read as a
+    stream in a single pass.
+
+    Args:
+        archive_path: Path to the archive
+        name_filter: Called with each normalized member name; only members
+            for which it returns True are read
+
+    Yields:
+        Tuples of (normalized member name, member content)
+    """
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = normalize_member_name(info.filename)
+                if name_filter(name):
+                    yield name, zf.read(info)
+    else:
+        with tarfile.open(archive_path, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                name = normalize_member_name(member.name)
+                if not name_filter(name):
+                    continue
+                f = tf.extractfile(member)
+                if f is not None:
+                    yield name, f.read()
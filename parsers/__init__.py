@@ -2,8 +2,11 @@
 Annotation parsers for different dataset formats.
 """
 
-from .xml_parser import parse_xml
-from .json_parser import parse_json
-from .txt_parser import parse_txt
+from .xml_parser import parse_xml, parse_xml_bytes
+from .json_parser import parse_json, parse_json_bytes
+from .txt_parser import parse_txt, parse_txt_bytes
 
-__all__ = ['parse_xml', 'parse_json', 'parse_txt']
+__all__ = [
+    'parse_xml', 'parse_json', 'parse_txt',
+    'parse_xml_bytes', 'parse_json_bytes', 'parse_txt_bytes'
+]
@@ -21,25 +21,49 @@ def parse_json(file_path: str) -> Dict[str, List[str]]:
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        annotations = {}
-        
-        # Try COCO format first
-        if 'categories' in data and 'annotations' in data:
-            annotations = _parse_coco_format(data)
-        # Try LabelMe format
-        elif 'shapes' in data:
-            annotations = _parse_labelme_format(data)
-        # Try single image COCO format
-        elif isinstance(data, dict) and any(key in data for key in ['image', 'annotations']):
-            annotations = _parse_single_coco_format(data)
-        
-        return annotations
+        return _parse_json_data(data)
     
     except Exception as e:
         print(f"Error parsing JSON file {file_path}: {e}")
         return {}
 
 
+def parse_json_bytes(data: bytes, source: str = '<bytes>') -> Dict[str, List[str]]:
+    """
+    Parse JSON annotation content already read into memory.
+    
+    Args:
+        data: Raw JSON file content (UTF-8)
+        source: Name used in error messages
+        
+    Returns:
+        Dictionary mapping class names to list of annotations
+    """
+    try:
+        return _parse_json_data(json.loads(data.decode('utf-8')))
+    
+    except Exception as e:
+        print(f"Error parsing JSON file {source}: {e}")
+        return {}
+
+
+def _parse_json_data(data) -> Dict[str, List[str]]:
+    """Detect the annotation format of loaded JSON and parse it."""
+    annotations = {}
+    
+    # Try COCO format first
+    if 'categories' in data and 'annotations' in data:
+        annotations = _parse_coco_format(data)
+    # Try LabelMe format
+    elif 'shapes' in data:
+        annotations = _parse_labelme_format(data)
+    # Try single image COCO format
+    elif isinstance(data, dict) and any(key in data for key in ['image', 'annotations']):
+        annotations = _parse_single_coco_format(data)
+    
+    return annotations
+
+
 def _parse_coco_format(data: dict) -> Dict[str, List[str]]:
     """Parse COCO dataset format."""
     annotations = {}
@@ -19,44 +19,70 @@ def parse_txt(file_path: str, class_names: Optional[List[str]] = None) -> Dict[s
         Dictionary mapping class names to list of annotations
     """
     try:
-        annotations = {}
-        
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            parts = line.split()
-            if len(parts) >= 5:  # class_id x_center y_center width height
-                try:
-                    class_id = int(parts[0])
-                    
-                    # Get class name
-                    if class_names and 0 <= class_id < len(class_names):
-                        class_name = class_names[class_id]
-                    else:
-                        class_name = f"class_{class_id}"
-                    
-                    # Store bbox info
-                    bbox_info = f"{parts[1]},{parts[2]},{parts[3]},{parts[4]}"
-                    
-                    if class_name not in annotations:
-                        annotations[class_name] = []
-                    annotations[class_name].append(bbox_info)
-                
-                except (ValueError, IndexError):
-                    continue
-        
-        return annotations
+        return _parse_yolo_lines(lines, class_names)
     
     except Exception as e:
         print(f"Error parsing TXT file {file_path}: {e}")
         return {}
 
 
+def parse_txt_bytes(data: bytes, class_names: Optional[List[str]] = None,
+                    source: str = '<bytes>') -> Dict[str, List[str]]:
+    """
+    Parse YOLO format content already read into memory.
+    
+    Args:
+        data: Raw TXT file content (UTF-8)
+        class_names: List of class names (index corresponds to class_id)
+        source: Name used in error messages
+        
+    Returns:
+        Dictionary mapping class names to list of annotations
+    """
+    try:
+        return _parse_yolo_lines(data.decode('utf-8').splitlines(), class_names)
+    
+    except Exception as e:
+        print(f"Error parsing TXT file {source}: {e}")
+        return {}
+
+
+def _parse_yolo_lines(lines: List[str], class_names: Optional[List[str]]) -> Dict[str, List[str]]:
+    """Parse YOLO annotation lines."""
+    annotations = {}
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        
+        parts = line.split()
+        if len(parts) >= 5:  # class_id x_center y_center width height
+            try:
+                class_id = int(parts[0])
+                
+                # Get class name
+                if class_names and 0 <= class_id < len(class_names):
+                    class_name = class_names[class_id]
+                else:
+                    class_name = f"class_{class_id}"
+                
+                # Store bbox info
+                bbox_info = f"{parts[1]},{parts[2]},{parts[3]},{parts[4]}"
+                
+                if class_name not in annotations:
+                    annotations[class_name] = []
+                annotations[class_name].append(bbox_info)
+            
+            except (ValueError, IndexError):
+                continue
+    
+    return annotations
+
+
 def find_class_names_file(directory: str) -> Optional[str]:
     """
     Find classes.txt or obj.names file in directory or parent directories.
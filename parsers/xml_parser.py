@@ -21,39 +21,61 @@ def parse_xml(file_path: str) -> Dict[str, List[str]]:
     """
     try:
         tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        annotations = {}
-        
-        # Extract all objects
-        for obj in root.findall('object'):
-            name_elem = obj.find('name')
-            if name_elem is not None and name_elem.text:
-                class_name = name_elem.text.strip()
-                
-                # Get bounding box if available
-                bbox_elem = obj.find('bndbox')
-                bbox_info = ""
-                if bbox_elem is not None:
-                    xmin = bbox_elem.find('xmin')
-                    ymin = bbox_elem.find('ymin')
-                    xmax = bbox_elem.find('xmax')
-                    ymax = bbox_elem.find('ymax')
-                    
-                    if all(elem is not None for elem in [xmin, ymin, xmax, ymax]):
-                        bbox_info = f"{xmin.text},{ymin.text},{xmax.text},{ymax.text}"
-                
-                if class_name not in annotations:
-                    annotations[class_name] = []
-                annotations[class_name].append(bbox_info)
-        
-        return annotations
+        return _parse_voc_root(tree.getroot())
     
     except Exception as e:
         print(f"Error parsing XML file {file_path}: {e}")
         return {}
 
 
+def parse_xml_bytes(data: bytes, source: str = '<bytes>') -> Dict[str, List[str]]:
+    """
+    Parse Pascal VOC format XML content already read into memory.
+    
+    Args:
+        data: Raw XML file content
+        source: Name used in error messages
+        
+    Returns:
+        Dictionary mapping class names to list of bounding boxes
+    """
+    try:
+        return _parse_voc_root(ET.fromstring(data))
+    
+    except Exception as e:
+        print(f"Error parsing XML file {source}: {e}")
+        return {}
+
+
+def _parse_voc_root(root: ET.Element) -> Dict[str, List[str]]:
+    """Extract objects from a parsed Pascal VOC document."""
+    annotations = {}
+    
+    # Extract all objects
+    for obj in root.findall('object'):
+        name_elem = obj.find('name')
+        if name_elem is not None and name_elem.text:
+            class_name = name_elem.text.strip()
+            
+            # Get bounding box if available
+            bbox_elem = obj.find('bndbox')
+            bbox_info = ""
+            if bbox_elem is not None:
+                xmin = bbox_elem.find('xmin')
+                ymin = bbox_elem.find('ymin')
+                xmax = bbox_elem.find('xmax')
+                ymax = bbox_elem.find('ymax')
+                
+                if all(elem is not None for elem in [xmin, ymin, xmax, ymax]):
+                    bbox_info = f"{xmin.text},{ymin.text},{xmax.text},{ymax.text}"
+            
+            if class_name not in annotations:
+                annotations[class_name] = []
+            annotations[class_name].append(bbox_info)
+    
+    return annotations
+
+
 def is_xml_file(file_path: str) -> bool:
     """Check if file is an XML file."""
     return Path(file_path).suffix.lower() == '.xml'
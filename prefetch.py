@@ -0,0 +1,114 @@
+"""
+I/O prefetcher - reads files with a bounded thread pool so that
+filesystem latency (NFS/SMB round trips) overlaps with parsing.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+# Default number of concurrent reads
+DEFAULT_IO_WORKERS = 8
+
+# Default upper bound on bytes read but not yet consumed
+DEFAULT_PREFETCH_BYTES = 64 * 1024 * 1024
+
+
+class ByteBudget:
+    """Blocks readers while too many prefetched bytes are waiting to be consumed."""
+
+    def __init__(self, limit: int):
+        """
+        Initialize budget.
+
+        Args:
+            limit: Maximum bytes held at once
+        """
+        self.limit = limit
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int):
+        """Reserve `size` bytes, waiting for room. Oversized files wait for an empty budget."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.in_use == 0 or self.in_use + size <= self.limit)
+            self.in_use += size
+
+    def release(self, size: int):
+        """Return `size` bytes to the budget."""
+        with self._cond:
+            self.in_use -= size
+            self._cond.notify_all()
+
+
+def _read_file(path: Path, budget: ByteBudget) -> Tuple[Optional[bytes], int]:
+    """Read a whole file within the byte budget. Returns (content, reserved bytes)."""
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            budget.acquire(size)
+            try:
+                return f.read(), size
+            except Exception:
+                budget.release(size)
+                raise
+    except Exception as e:
+        print(f"Error reading file {path}: {e}")
+        return None, 0
+
+
+def prefetch_files(paths: Iterable[Path], workers: int = DEFAULT_IO_WORKERS,
+                   max_bytes: int = DEFAULT_PREFETCH_BYTES) -> Iterator[Tuple[Path, Optional[bytes]]]:
+    """
+    Read files concurrently and yield their contents as they complete.
+
+    Paths are pulled lazily, so directory traversal also overlaps with
+    reading. Results are yielded in completion order, not input order.
+
+    Args:
+        paths: Files to read
+        workers: Number of reader threads
+        max_bytes: Memory budget for content read but not yet consumed
+
+    Yields:
+        Tuples of (path, content); content is None if the file could not be read
+    """
+    budget = ByteBudget(max_bytes)
+    max_pending = workers * 4
+    path_iter = iter(paths)
+    pending = {}
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch') as pool:
+        try:
+            while True:
+                # Keep the pool fed without materializing the whole path list
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        path = next(path_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[pool.submit(_read_file, path, budget)] = path
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    data, size = future.result()
+                    path = pending.pop(future)
+                    try:
+                        yield path, data
+                    finally:
+                        budget.release(size)
+        finally:
+            # Consumer stopped early: drop queued reads and free the budget so
+            # readers blocked on it can finish before the pool shuts down
+            for future in pending:
+                future.cancel()
+            for future in as_completed([f for f in pending if not f.cancelled()]):
+                budget.release(future.result()[1])
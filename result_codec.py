@@ -0,0 +1,102 @@
+"""
+Compact serialization for analysis results.
+
+Class locations are absolute directory paths that repeat across classes
+and share long prefixes. The compact form stores every distinct location
+once in a front-coded table (each entry keeps the length of the prefix
+shared with the previous entry plus the remaining suffix) and replaces
+per-class locations with indices into that table. The binary form is the
+compact form as gzip-compressed JSON.
+"""
+
+import gzip
+import json
+from typing import Dict, Any, List
+
+
+# Format marker stored in every compact payload
+FORMAT = 'dfr1'
+
+# Media type used to negotiate compact API responses
+MEDIA_TYPE = 'application/vnd.dataset-finder.compact+json'
+
+
+def encode_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert analysis results to the compact form.
+
+    Args:
+        results: Analysis results dictionary
+
+    Returns:
+        JSON-serializable compact dictionary
+    """
+    classes = results.get('classes', [])
+    paths = sorted({loc for class_data in classes for loc in class_data.get('locations', [])})
+    index = {path: i for i, path in enumerate(paths)}
+
+    encoded = dict(results)
+    encoded['format'] = FORMAT
+    encoded['paths'] = _front_code(paths)
+    encoded['classes'] = [
+        dict(class_data, locations=[index[loc] for loc in class_data.get('locations', [])])
+        for class_data in classes
+    ]
+    return encoded
+
+
+def decode_results(encoded: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert compact results back to the regular form.
+
+    Args:
+        encoded: Compact dictionary produced by encode_results
+
+    Returns:
+        Analysis results dictionary
+    """
+    if encoded.get('format') != FORMAT:
+        raise ValueError(f"Unsupported results format: {encoded.get('format')!r}")
+
+    paths = _front_decode(encoded['paths'])
+    results = {k: v for k, v in encoded.items() if k not in ('format', 'paths')}
+    results['classes'] = [
+        dict(class_data, locations=[paths[i] for i in class_data.get('locations', [])])
+        for class_data in encoded.get('classes', [])
+    ]
+    return results
+
+
+def dumps(results: Dict[str, Any]) -> bytes:
+    """Serialize analysis results to compressed compact bytes."""
+    text = json.dumps(encode_results(results), ensure_ascii=False, separators=(',', ':'))
+    return gzip.compress(text.encode('utf-8'))
+
+
+def loads(data: bytes) -> Dict[str, Any]:
+    """Deserialize analysis results produced by dumps."""
+    return decode_results(json.loads(gzip.decompress(data).decode('utf-8')))
+
+
+def _front_code(paths: List[str]) -> List[list]:
+    """Front-code a sorted list of strings as [shared_prefix_length, suffix] pairs."""
+    coded = []
+    previous = ''
+    for path in paths:
+        shared = 0
+        limit = min(len(previous), len(path))
+        while shared < limit and previous[shared] == path[shared]:
+            shared += 1
+        coded.append([shared, path[shared:]])
+        previous = path
+    return coded
+
+
+def _front_decode(coded: List[list]) -> List[str]:
+    """Restore strings front-coded by _front_code."""
+    paths = []
+    previous = ''
+    for shared, suffix in coded:
+        previous = previous[:shared] + suffix
+        paths.append(previous)
+    return paths
@@ -8,6 +8,8 @@ let analysisResults = null;
 let currentSort = { column: 'class_name', ascending: true };
 let currentBrowserPath = null;
 let selectedBrowserPath = null;
+let watchSource = null;
+let watchPath = null;
 
 // DOM Elements
 const pathInput = document.getElementById('pathInput');
@@ -18,6 +20,9 @@ const loadingIndicator = document.getElementById('loadingIndicator');
 const searchInput = document.getElementById('searchInput');
 const tableBody = document.getElementById('tableBody');
 const exportBtn = document.getElementById('exportBtn');
+const watchBtn = document.getElementById('watchBtn');
+const estimateToggle = document.getElementById('estimateToggle');
+const archivesToggle = document.getElementById('archivesToggle');
 
 // Modal Elements
 const dirModal = document.getElementById('dirModal');
@@ -34,6 +39,14 @@ const reloadAllBtn = document.getElementById('reloadAllBtn');
 const MAX_HISTORY = 10;
 const HISTORY_KEY = 'dataset_finder_history';
 const CACHE_KEY = 'dataset_finder_results_cache';
+const JOB_POLL_INTERVAL = 2000;
+
+// Compact results format (see result_codec.py)
+const COMPACT_FORMAT = 'dfr1';
+const ANALYZE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/vnd.dataset-finder.compact+json, application/json'
+};
 
 
 // Event Listeners
@@ -44,6 +57,7 @@ cancelModalBtn.addEventListener('click', closeBrowserModal);
 confirmModelBtn.addEventListener('click', confirmSelection);
 searchInput.addEventListener('input', filterTable);
 exportBtn.addEventListener('click', exportToExcel);
+watchBtn.addEventListener('click', toggleWatch);
 quickLinkItems.forEach(item => {
     item.addEventListener('click', () => {
         const path = item.dataset.path || item.textContent.trim();
@@ -201,17 +215,28 @@ async function startAnalysis(specificPath = null, useCache = false) {
         }
     }
 
+    // A new analysis replaces any live view of another dataset
+    if (watchPath && watchPath !== path) {
+        stopWatch();
+    }
+
     try {
         // Show loading
         loadingIndicator.classList.remove('hidden');
         resultsSection.classList.add('hidden');
         scanBtn.disabled = true;
 
+        const estimate = estimateToggle.checked;
+
         // Call API
         const response = await fetch('/api/analyze', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ path })
+            headers: ANALYZE_HEADERS,
+            body: JSON.stringify({
+                path,
+                mode: estimate ? 'estimate' : 'exact',
+                scan_archives: archivesToggle.checked
+            })
         });
 
         const data = await response.json();
@@ -221,11 +246,21 @@ async function startAnalysis(specificPath = null, useCache = false) {
         }
 
         if (data.success) {
-            analysisResults = data.data;
-            saveToCache(path, analysisResults);
+            analysisResults = decodeResults(data.data);
             displayResults(analysisResults);
             saveToHistory(path);
-            showToast('分析完成!', 'success');
+            if (analysisResults.estimated) {
+                // Estimates are not cached; the exact scan replaces them
+                if (data.job_id) {
+                    showToast('已显示估算结果,精确统计正在后台进行...', 'success');
+                    pollExactJob(data.job_id, path, analysisResults);
+                } else {
+                    showToast('已显示估算结果,后台任务繁忙,暂未开始精确统计', 'warning');
+                }
+            } else {
+                saveToCache(path, analysisResults);
+                showToast('分析完成!', 'success');
+            }
         } else {
             throw new Error(data.error || '未知错误');
         }
@@ -238,6 +273,43 @@ async function startAnalysis(specificPath = null, useCache = false) {
     }
 }
 
+/**
+ * Poll a background exact scan and replace the estimate when it finishes
+ */
+async function pollExactJob(jobId, path, estimatedResults) {
+    if (!jobId) return;
+
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+
+        // Stop if the user has moved on to other results
+        if (analysisResults !== estimatedResults) return;
+
+        try {
+            const response = await fetch(`/api/analyze/jobs/${jobId}`, { headers: ANALYZE_HEADERS });
+            const data = await response.json();
+
+            if (!response.ok || !data.success) {
+                throw new Error(data.error || '精确统计失败');
+            }
+            if (data.status !== 'done') continue;
+
+            if (analysisResults === estimatedResults) {
+                analysisResults = decodeResults(data.data);
+                saveToCache(path, analysisResults);
+                displayStats(analysisResults);
+                applyCurrentSort();
+                showToast('精确统计完成,结果已更新', 'success');
+            }
+            return;
+        } catch (error) {
+            console.error('Error polling exact scan:', error);
+            showToast('精确统计失败: ' + error.message, 'error');
+            return;
+        }
+    }
+}
+
 /**
  * Get results from cache
  */
@@ -246,7 +318,7 @@ function getCachedResults(path) {
     if (!cacheStr) return null;
     try {
         const cache = JSON.parse(cacheStr);
-        return cache[path] || null;
+        return cache[path] ? decodeResults(cache[path]) : null;
     } catch (e) {
         return null;
     }
@@ -263,8 +335,63 @@ function saveToCache(path, results) {
             cache = JSON.parse(cacheStr);
         } catch (e) { }
     }
-    cache[path] = results;
-    sessionStorage.setItem(CACHE_KEY, JSON.stringify(cache));
+    // Stored compact to stay within sessionStorage size limits
+    cache[path] = encodeResults(results);
+    try {
+        sessionStorage.setItem(CACHE_KEY, JSON.stringify(cache));
+    } catch (e) {
+        console.error('Error saving results cache:', e);
+    }
+}
+
+/**
+ * Encode results in the compact format: distinct locations are stored once,
+ * front-coded as [sharedPrefixLength, suffix], and classes refer to them by index
+ */
+function encodeResults(results) {
+    if (!results || results.format === COMPACT_FORMAT) return results;
+
+    const classes = results.classes || [];
+    const paths = [...new Set(classes.flatMap(c => c.locations || []))].sort();
+    const index = new Map(paths.map((path, i) => [path, i]));
+
+    // Prefix lengths count code points to match the Python encoder
+    const coded = [];
+    let previous = [];
+    paths.forEach(path => {
+        const chars = Array.from(path);
+        let shared = 0;
+        while (shared < previous.length && shared < chars.length && previous[shared] === chars[shared]) {
+            shared++;
+        }
+        coded.push([shared, chars.slice(shared).join('')]);
+        previous = chars;
+    });
+
+    return {
+        ...results,
+        format: COMPACT_FORMAT,
+        paths: coded,
+        classes: classes.map(c => ({ ...c, locations: (c.locations || []).map(loc => index.get(loc)) }))
+    };
+}
+
+/**
+ * Decode compact results; plain results are returned unchanged
+ */
+function decodeResults(encoded) {
+    if (!encoded || encoded.format !== COMPACT_FORMAT) return encoded;
+
+    const paths = [];
+    let previous = [];
+    encoded.paths.forEach(([shared, suffix]) => {
+        previous = previous.slice(0, shared).concat(Array.from(suffix));
+        paths.push(previous.join(''));
+    });
+
+    const { format, paths: _paths, ...results } = encoded;
+    results.classes = (encoded.classes || []).map(c => ({ ...c, locations: (c.locations || []).map(i => paths[i]) }));
+    return results;
 }
 
 /**
@@ -272,9 +399,7 @@ function saveToCache(path, results) {
  */
 function displayResults(results) {
     // Update statistics
-    document.getElementById('totalClasses').textContent = results.total_classes || 0;
-    document.getElementById('totalAnnotations').textContent = results.total_annotations || 0;
-    document.getElementById('totalFiles').textContent = results.total_files || 0;
+    displayStats(results);
 
     // Render table
     renderTable(results.classes || []);
@@ -286,6 +411,29 @@ function displayResults(results) {
     resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
 }
 
+/**
+ * Update statistics cards
+ */
+function displayStats(results) {
+    const prefix = results.estimated ? '≈' : '';
+    document.getElementById('totalClasses').textContent = results.total_classes || 0;
+    document.getElementById('totalAnnotations').textContent = prefix + (results.total_annotations || 0);
+    document.getElementById('totalFiles').textContent = prefix + (results.total_files || 0);
+
+    // Explain what an estimate covers, including archives it left out
+    const notice = document.getElementById('estimateNotice');
+    if (results.estimated) {
+        let text = `⚡ 抽样估算结果: 已解析 ${results.sampled_files} / ${results.candidate_files} 个标注文件`;
+        if (results.archives_skipped) {
+            text += `; ${results.archives_skipped} 个压缩包未计入估算,将在精确统计中包含`;
+        }
+        notice.textContent = text;
+        notice.classList.remove('hidden');
+    } else {
+        notice.classList.add('hidden');
+    }
+}
+
 /**
  * Render data table
  */
@@ -327,12 +475,22 @@ function renderTable(classes) {
 
         // 3. Annotations Count
         const annotationsCell = document.createElement('td');
-        annotationsCell.innerHTML = `<span>${classData.annotations}</span>`;
+        if (classData.annotations_ci) {
+            const [low, high] = classData.annotations_ci;
+            annotationsCell.innerHTML = `<span title="置信区间 ${low} - ${high}">≈${classData.annotations}</span><span class="estimate-note">(${low}-${high})</span>`;
+        } else {
+            annotationsCell.innerHTML = `<span>${classData.annotations}</span>`;
+        }
         row.appendChild(annotationsCell);
 
         // 4. Files Count
         const filesCell = document.createElement('td');
-        filesCell.textContent = classData.files;
+        if (classData.files_ci) {
+            filesCell.textContent = `≈${classData.files}`;
+            filesCell.title = `置信区间 ${classData.files_ci[0]} - ${classData.files_ci[1]}`;
+        } else {
+            filesCell.textContent = classData.files;
+        }
         row.appendChild(filesCell);
 
         // 5. Locations (Dropdown)
@@ -438,6 +596,15 @@ function sortTable(column) {
         currentSort.ascending = true;
     }
 
+    applyCurrentSort();
+}
+
+/**
+ * Re-sort results by the current sort settings and re-render
+ */
+function applyCurrentSort() {
+    const column = currentSort.column;
+
     // Sort data
     const sortedClasses = [...analysisResults.classes].sort((a, b) => {
         let aVal = a[column];
@@ -467,6 +634,72 @@ function sortTable(column) {
     filterTable(); // This will re-render with current search filter
 }
 
+/**
+ * Toggle live watch mode for the current dataset
+ */
+function toggleWatch() {
+    if (watchSource) {
+        stopWatch();
+        showToast('已停止实时监控', 'success');
+    } else {
+        startWatch();
+    }
+}
+
+/**
+ * Subscribe to live analysis updates from the server
+ */
+function startWatch() {
+    const path = (analysisResults && analysisResults.root_path) || pathInput.value.trim();
+    if (!path) {
+        showToast('请输入或选择数据集路径', 'error');
+        return;
+    }
+
+    watchPath = path;
+    watchSource = new EventSource('/api/watch?path=' + encodeURIComponent(path) + (archivesToggle.checked ? '&archives=1' : ''));
+    watchBtn.textContent = '⏹ 停止监控';
+    watchBtn.classList.add('active');
+
+    watchSource.onmessage = (event) => {
+        const firstUpdate = !analysisResults || analysisResults.root_path !== path;
+        analysisResults = decodeResults(JSON.parse(event.data));
+        saveToCache(path, analysisResults);
+
+        // Keep the user's current sort and search while updating in place
+        if (firstUpdate) {
+            displayResults(analysisResults);
+        } else {
+            displayStats(analysisResults);
+            applyCurrentSort();
+        }
+    };
+
+    watchSource.onerror = () => {
+        // EventSource reconnects automatically; only report closed streams
+        if (watchSource && watchSource.readyState === EventSource.CLOSED) {
+            stopWatch();
+            showToast('实时监控连接已断开', 'error');
+        }
+    };
+
+    showToast('已开启实时监控', 'success');
+}
+
+/**
+ * Stop live watch mode
+ */
+function stopWatch() {
+    // The server stops the watcher once its last stream closes
+    if (watchSource) {
+        watchSource.close();
+        watchSource = null;
+    }
+    watchPath = null;
+    watchBtn.textContent = '👁 实时监控';
+    watchBtn.classList.remove('active');
+}
+
 /**
  * Export results to Excel
  */
@@ -751,7 +984,7 @@ async function reloadAllQuickLinks(e) {
         try {
             const response = await fetch('/api/analyze', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: ANALYZE_HEADERS,
                 body: JSON.stringify({ path })
             });
 
@@ -764,7 +997,7 @@ async function reloadAllQuickLinks(e) {
             }
 
             if (data.success) {
-                saveToCache(path, data.data);
+                saveToCache(path, decodeResults(data.data));
                 if (bar) bar.classList.add('success');
                 successCount++;
             } else {
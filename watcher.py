@@ -0,0 +1,372 @@
+"""
+Dataset watcher - keeps an analysis live by applying filesystem changes
+as incremental updates instead of rescanning the whole tree.
+
+Uses inotify on Linux and falls back to polling file modification times
+elsewhere, or when inotify is unavailable or cannot watch the whole tree.
+"""
+
+import os
+import sys
+import errno
+import struct
+import select
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from analyzer import DatasetAnalyzer, should_skip_dir
+from prefetch import DEFAULT_PREFETCH_BYTES
+
+
+# inotify event masks (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """Load libc inotify functions, or return None if unsupported."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class DatasetWatcher:
+    """Watches a dataset directory and keeps its analysis results up to date."""
+
+    def __init__(self, root_path: str, poll_interval: float = 2.0,
+                 use_inotify: bool = True, debounce: float = 0.5,
+                 scan_archives: bool = False, io_workers: int = 0,
+                 prefetch_bytes: int = DEFAULT_PREFETCH_BYTES):
+        """
+        Initialize watcher.
+
+        Args:
+            root_path: Root directory to watch
+            poll_interval: Seconds between scans in polling mode
+            use_inotify: Use inotify when available (Linux only)
+            debounce: Seconds to collect events before publishing an update
+            scan_archives: Also read annotation files inside zip/tar archives
+            io_workers: Threads prefetching file contents for full scans
+            prefetch_bytes: Memory budget for prefetched file contents
+        """
+        self.root_path = Path(root_path).resolve()
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.scan_archives = scan_archives
+        self.io_workers = io_workers
+        self.prefetch_bytes = prefetch_bytes
+        self.analyzer = self._new_analyzer()
+        self.mode = None
+
+        self._libc = _load_libc() if use_inotify else None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._version = 0
+        self._results = None
+
+    def start(self):
+        """
+        Run the initial scan and start watching in a background thread.
+
+        Safe to call from several threads; later callers wait for the
+        first one's initial scan and then return.
+        """
+        with self._start_lock:
+            if self._thread is None and not self._stop.is_set():
+                self._start()
+
+    def _start(self):
+        """Register watches, run the initial scan and start the watch thread."""
+        # Watches are registered before the initial scan so nothing is missed
+        inotify_fd = self._init_inotify() if self._libc else None
+        if inotify_fd is not None:
+            self.mode = 'inotify'
+            target = self._run_inotify
+            args = (inotify_fd,)
+        else:
+            self.mode = 'polling'
+            target = self._run_polling
+            args = (self._stat_tree(),)
+
+        with self._lock:
+            self.analyzer.analyze()
+            self._publish()
+
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        with self._lock:
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def stopped(self) -> bool:
+        """Whether stop() has been called."""
+        return self._stop.is_set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the watch thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Get the current version number and results."""
+        with self._lock:
+            return self._version, self._results
+
+    def wait_for_update(self, version: int, timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """
+        Block until results newer than `version` are available.
+
+        Args:
+            version: Last version seen by the caller
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Tuple of (version, results); version is unchanged on timeout
+        """
+        with self._lock:
+            self._changed.wait_for(
+                lambda: self._version > version or self._stop.is_set(),
+                timeout=timeout
+            )
+            return self._version, self._results
+
+    def _new_analyzer(self) -> DatasetAnalyzer:
+        """Create an analyzer configured for this watcher."""
+        return DatasetAnalyzer(str(self.root_path), scan_archives=self.scan_archives,
+                               io_workers=self.io_workers, prefetch_bytes=self.prefetch_bytes)
+
+    def _publish(self):
+        """Format results and wake waiting subscribers. Caller holds the lock."""
+        self._results = self.analyzer.get_results()
+        self._results['watch_mode'] = self.mode
+        self._version += 1
+        self._changed.notify_all()
+
+    # ------------------------------------------------------------------
+    # inotify backend
+    # ------------------------------------------------------------------
+
+    def _init_inotify(self) -> Optional[int]:
+        """Create an inotify instance watching the whole tree."""
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        self._inotify_fd = fd
+        self._watch_dirs = {}
+        self._watch_failed = False
+        self._add_watch_tree(self.root_path)
+        if self._watch_failed:
+            # A partially watched tree would silently miss changes
+            print(f"inotify cannot cover {self.root_path}, falling back to polling")
+            os.close(fd)
+            return None
+        return fd
+
+    def _add_watch_tree(self, directory: Path):
+        """Recursively register inotify watches for a directory tree."""
+        wd = self._libc.inotify_add_watch(self._inotify_fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            import ctypes
+            err = ctypes.get_errno()
+            # A directory removed before it could be watched needs no watch
+            if err != errno.ENOENT:
+                print(f"Cannot watch {directory}: {os.strerror(err)} (inotify watch limit reached?)")
+                self._watch_failed = True
+            return
+        self._watch_dirs[wd] = directory
+        try:
+            for entry in os.scandir(directory):
+                if entry.is_dir() and not should_skip_dir(entry.name):
+                    self._add_watch_tree(Path(entry.path))
+        except PermissionError:
+            print(f"Permission denied: {directory}")
+        except OSError as e:
+            print(f"Error watching {directory}: {e}")
+
+    def _drop_watch_tree(self, directory: str):
+        """Remove watches for a directory that was deleted or moved away."""
+        prefix = directory + os.sep
+        for wd, path in list(self._watch_dirs.items()):
+            if str(path) == directory or str(path).startswith(prefix):
+                self._libc.inotify_rm_watch(self._inotify_fd, wd)
+                del self._watch_dirs[wd]
+
+    def _scan_new_directory(self, directory: Path):
+        """Watch and process a directory that appeared after the initial scan."""
+        self._add_watch_tree(directory)
+        for dirpath, dirnames, filenames in os.walk(directory, followlinks=True):
+            dirnames[:] = [d for d in dirnames if not should_skip_dir(d)]
+            for filename in filenames:
+                self.analyzer.update_file(os.path.join(dirpath, filename))
+
+    def _run_inotify(self, fd: int):
+        """Read inotify events and apply them as deltas."""
+        previous = None
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+
+                # Coalesce bursts of events into a single published update
+                time.sleep(self.debounce)
+                changes = {}
+                overflow = False
+                while True:
+                    try:
+                        buf = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        break
+                    overflow |= self._collect_events(buf, changes)
+
+                if not changes and not overflow:
+                    continue
+                with self._lock:
+                    if overflow:
+                        self._rescan()
+                    else:
+                        self._apply_changes(changes)
+                    if self._watch_failed:
+                        # A new directory could not be watched; switch to
+                        # polling, baselined before the rescan so nothing is lost
+                        print(f"inotify cannot cover {self.root_path}, falling back to polling")
+                        self.mode = 'polling'
+                        previous = self._stat_tree()
+                        self._rescan()
+                    self._publish()
+                if previous is not None:
+                    break
+        finally:
+            os.close(fd)
+
+        if previous is not None:
+            self._run_polling(previous)
+
+    def _collect_events(self, buf: bytes, changes: Dict[str, str]) -> bool:
+        """
+        Decode raw inotify events into a path -> action mapping.
+
+        Returns:
+            True if the kernel event queue overflowed
+        """
+        overflow = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self._watch_dirs.pop(wd, None)
+                continue
+
+            directory = self._watch_dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = str(directory / os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changes[path] = 'dir_created'
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changes[path] = 'dir_removed'
+                    self._drop_watch_tree(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changes[path] = 'updated'
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                changes[path] = 'removed'
+        return overflow
+
+    def _apply_changes(self, changes: Dict[str, str]):
+        """Apply collected changes to the analyzer. Caller holds the lock."""
+        for path, action in changes.items():
+            if action == 'updated':
+                self.analyzer.update_file(path)
+            elif action == 'removed':
+                self.analyzer.remove_file(path)
+            elif action == 'dir_removed':
+                self.analyzer.remove_directory(path)
+            elif action == 'dir_created' and not should_skip_dir(Path(path).name):
+                # A removal of the same path in this batch (e.g. an atomic
+                # directory swap) was collapsed into this entry
+                self.analyzer.remove_directory(path)
+                self._scan_new_directory(Path(path))
+
+    def _rescan(self):
+        """Fall back to a full rescan after lost events. Caller holds the lock."""
+        self.analyzer = self._new_analyzer()
+        self.analyzer.analyze()
+
+    # ------------------------------------------------------------------
+    # Polling backend
+    # ------------------------------------------------------------------
+
+    def _stat_tree(self) -> Dict[str, Tuple[int, int]]:
+        """Collect (mtime, size) for every file below the root."""
+        stats = {}
+        for dirpath, dirnames, filenames in os.walk(self.root_path, followlinks=True):
+            dirnames[:] = [d for d in dirnames if not should_skip_dir(d)]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _run_polling(self, previous: Dict[str, Tuple[int, int]]):
+        """Periodically compare file stats and re-parse only changed files."""
+        while not self._stop.wait(self.poll_interval):
+            current = self._stat_tree()
+            changes = {}
+            for path, stat in current.items():
+                if previous.get(path) != stat:
+                    changes[path] = 'updated'
+            for path in previous.keys() - current.keys():
+                changes[path] = 'removed'
+            previous = current
+
+            if changes:
+                with self._lock:
+                    self._apply_changes(changes)
+                    self._publish()